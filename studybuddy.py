@@ -1,7 +1,7 @@
 import os
 import sqlite3
 import re
-from typing import List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 
 # SQLite file path for this app
 DB_PATH = "studybuddy.db"
@@ -9,7 +9,13 @@ DB_PATH = "studybuddy.db"
 # List for days in a week
 DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
-# Database schema (run once on startup)
+# Weekday sort key stored with each availability row (Mon=1 .. Sun=7)
+DAY_RANK = {d: i for i, d in enumerate(DAYS, start=1)}
+
+# Bumped whenever SCHEMA_SQL or migrate_db changes; stored in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+# Database schema (run when the stored user_version is behind SCHEMA_VERSION)
 SCHEMA_SQL = """
 PRAGMA foreign_keys = ON;
 
@@ -32,6 +38,9 @@ CREATE TABLE IF NOT EXISTS availability (
   day_of_week TEXT NOT NULL CHECK(day_of_week IN ('Mon','Tue','Wed','Thu','Fri','Sat','Sun')),
   start_time TEXT NOT NULL,  -- "HH:MM"
   end_time   TEXT NOT NULL,  -- "HH:MM"
+  start_min  INTEGER,        -- minutes since midnight
+  end_min    INTEGER,        -- minutes since midnight
+  day_rank   INTEGER,        -- Mon=1 .. Sun=7
   UNIQUE(username, day_of_week, start_time, end_time),
   FOREIGN KEY (username) REFERENCES student(username) ON DELETE CASCADE
 );
@@ -44,31 +53,50 @@ CREATE TABLE IF NOT EXISTS session (
   day_of_week TEXT NOT NULL CHECK(day_of_week IN ('Mon','Tue','Wed','Thu','Fri','Sat','Sun')),
   start_time TEXT NOT NULL,
   end_time   TEXT NOT NULL,
+  start_min  INTEGER,        -- minutes since midnight
+  end_min    INTEGER,        -- minutes since midnight
   status TEXT NOT NULL CHECK(status IN ('Proposed','Confirmed')),
   FOREIGN KEY (initiator_username) REFERENCES student(username),
   FOREIGN KEY (invitee_username)   REFERENCES student(username)
 );
 
-CREATE INDEX IF NOT EXISTS idx_enrollment_course ON enrollment(course_code);
-CREATE INDEX IF NOT EXISTS idx_avail_user ON availability(username);
-CREATE INDEX IF NOT EXISTS idx_session_invitee ON session(invitee_username, status);
+DROP INDEX IF EXISTS idx_enrollment_course;
+CREATE INDEX IF NOT EXISTS idx_enrollment_course_user ON enrollment(course_code, username);
+DROP INDEX IF EXISTS idx_avail_user;
+CREATE INDEX IF NOT EXISTS idx_avail_user_day ON availability(username, day_of_week);
+CREATE INDEX IF NOT EXISTS idx_avail_user_rank ON availability(username, day_rank, start_min);
+DROP INDEX IF EXISTS idx_session_invitee;
+CREATE INDEX IF NOT EXISTS idx_session_invitee_cov ON session(
+  invitee_username, status, id DESC,
+  course_code, initiator_username, day_of_week, start_time, end_time
+);
+CREATE INDEX IF NOT EXISTS idx_session_invitee_day ON session(invitee_username, day_of_week, status);
+CREATE INDEX IF NOT EXISTS idx_session_initiator_day ON session(initiator_username, day_of_week, status);
 """
 
 # time parsing functions and small helpers
 
+# HH:MM with optional AM/PM, space optional (compiled once at import)
+_TIME_RE = re.compile(r"(\d{1,2})\s*:\s*(\d{2})\s*(AM|PM)?")
+
+# Day spellings accepted by normalize_day (lowercase) mapped to "Mon".."Sun"
+_DAY_ALIASES = {
+    "mon": "Mon", "monday": "Mon",
+    "tue": "Tue", "tues": "Tue", "tuesday": "Tue",
+    "wed": "Wed", "weds": "Wed", "wednesday": "Wed",
+    "thu": "Thu", "thur": "Thu", "thurs": "Thu", "thursday": "Thu",
+    "fri": "Fri", "friday": "Fri",
+    "sat": "Sat", "saturday": "Sat",
+    "sun": "Sun", "sunday": "Sun",
+}
+
 def normalize_day(day_raw: str) -> Optional[str]:
     # Map many day spellings to "Mon".."Sun"
-    s = (day_raw or "").strip().lower()
-    aliases = {
-        "mon": "Mon", "monday": "Mon",
-        "tue": "Tue", "tues": "Tue", "tuesday": "Tue",
-        "wed": "Wed", "weds": "Wed", "wednesday": "Wed",
-        "thu": "Thu", "thur": "Thu", "thurs": "Thu", "thursday": "Thu",
-        "fri": "Fri", "friday": "Fri",
-        "sat": "Sat", "saturday": "Sat",
-        "sun": "Sun", "sunday": "Sun",
-    }
-    return aliases.get(s)
+    return _DAY_ALIASES.get((day_raw or "").strip().lower())
+
+def normalize_course(code_raw: str) -> str:
+    # Canonical course code: uppercase, single spaces ("math  4000 " -> "MATH 4000")
+    return " ".join((code_raw or "").upper().split())
 
 def parse_time_hhmm(t: str) -> Optional[Tuple[int, int]]:
     """
@@ -83,14 +111,17 @@ def parse_time_hhmm(t: str) -> Optional[Tuple[int, int]]:
     # Handle "p.m." / spaces / casing
     s = t.strip().upper().replace(".", "")
 
-    # HH:MM with optional AM/PM, space optional
-    m = re.fullmatch(r"(\d{1,2})\s*:\s*(\d{2})\s*(AM|PM)?", s) #use regex to match user time input
-    if not m:
-        return None
-
-    hour = int(m.group(1))
-    minute = int(m.group(2))
-    ampm = m.group(3)  # AM/PM or None
+    # Fast path for plain 24h "HH:MM", the common case in this app
+    hh, sep, mm = s.partition(":")
+    if sep and 1 <= len(hh) <= 2 and len(mm) == 2 and hh.isdecimal() and mm.isdecimal():
+        hour, minute, ampm = int(hh), int(mm), None
+    else:
+        m = _TIME_RE.fullmatch(s) #use regex to match user time input
+        if not m:
+            return None
+        hour = int(m.group(1))
+        minute = int(m.group(2))
+        ampm = m.group(3)  # AM/PM or None
 
     if not (0 <= minute <= 59):
         return None
@@ -124,34 +155,105 @@ def minutes_to_ampm(total_min: int) -> str:
     h12 = 12 if (h24 % 12) == 0 else (h24 % 12)
     return f"{h12}:{m:02d} {suffix}"
 
-def overlap_minutes(a_start: int, a_end: int, b_start: int, b_end: int) -> int:
-    # Inclusive start, exclusive end overlap length
-    start = max(a_start, b_start)
-    end = min(a_end, b_end)
-    return max(0, end - start)
-
 def interval_includes(inner_start: int, inner_end: int, outer_start: int, outer_end: int) -> bool:
     # Check inner fully inside outer
     return outer_start <= inner_start and inner_end <= outer_end
 
+def slots_include(slots: List[Tuple[int, int]], start: int, end: int) -> bool:
+    # Check some slot (sorted by start) fully contains start..end
+    for (s, e) in slots:
+        if s > start:
+            break
+        if interval_includes(start, end, s, e):
+            return True
+    return False
+
 def prompt(msg: str) -> str:
     # Simple input wrapper function
     return input(msg).strip()
 
 # Database functions
 
+# Connection-level settings (applied once when the shared connection opens)
+CONN_PRAGMAS = """
+PRAGMA foreign_keys = ON;
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA cache_size = -20000;
+"""
+
+_conn: Optional[sqlite3.Connection] = None
+
 def get_conn():
-    # New connection with row dicts and foreign key enforcement
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row
-    con.execute("PRAGMA foreign_keys = ON;")
-    return con
+    # Shared connection with row dicts, opened once and reused by every call
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+        _conn.row_factory = sqlite3.Row
+        _conn.executescript(CONN_PRAGMAS)
+    return _conn
+
+def migrate_db(con):
+    # Add the integer-minute columns to tables created by older versions, then
+    # fill any row still missing them so a rerun finishes an interrupted upgrade
+    for table in ("availability", "session"):
+        cols = {r[1] for r in con.execute(f"PRAGMA table_info({table})")}
+        if not cols:
+            continue
+        if "start_min" not in cols:
+            con.execute(f"ALTER TABLE {table} ADD COLUMN start_min INTEGER")
+            con.execute(f"ALTER TABLE {table} ADD COLUMN end_min INTEGER")
+        rows = con.execute(
+            f"SELECT id, start_time, end_time FROM {table} WHERE start_min IS NULL OR end_min IS NULL"
+        ).fetchall()
+        con.executemany(
+            f"UPDATE {table} SET start_min = ?, end_min = ? WHERE id = ?",
+            [(to_minutes(r[1]), to_minutes(r[2]), r[0]) for r in rows],
+        )
+    # Add the weekday sort key to availability tables from older versions
+    cols = {r[1] for r in con.execute("PRAGMA table_info(availability)")}
+    if cols:
+        if "day_rank" not in cols:
+            con.execute("ALTER TABLE availability ADD COLUMN day_rank INTEGER")
+        con.executemany(
+            "UPDATE availability SET day_rank = ? WHERE day_of_week = ? AND day_rank IS NULL",
+            [(rank, day) for day, rank in DAY_RANK.items()],
+        )
+
+def normalize_stored_courses(con):
+    # Rewrite course codes saved before normalize_course existed
+    rows = con.execute("SELECT id, course_code FROM session").fetchall()
+    con.executemany(
+        "UPDATE session SET course_code = ? WHERE id = ?",
+        [(normalize_course(code), row_id) for row_id, code in rows if normalize_course(code) != code],
+    )
+    # enrollment is UNIQUE(username, course_code): a row that collapses onto a
+    # course the user already has is a duplicate and is dropped
+    rows = con.execute("SELECT id, course_code FROM enrollment").fetchall()
+    for row_id, code in rows:
+        norm = normalize_course(code)
+        if norm == code:
+            continue
+        cur = con.execute(
+            "UPDATE OR IGNORE enrollment SET course_code = ? WHERE id = ?", (norm, row_id)
+        )
+        if cur.rowcount == 0:
+            con.execute("DELETE FROM enrollment WHERE id = ?", (row_id,))
 
 def init_db():
-    # Create tables on first run
+    # Create or upgrade tables; a database already at SCHEMA_VERSION is left untouched
     first = not os.path.exists(DB_PATH)
-    with get_conn() as con:
-        con.executescript(SCHEMA_SQL)
+    con = get_conn()
+    if con.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+    # Not one transaction (ALTER and executescript commit on their own), so each
+    # step is safe to rerun and the version is stamped only once all are saved
+    migrate_db(con)
+    con.executescript(SCHEMA_SQL)
+    normalize_stored_courses(con)
+    con.commit()
+    con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     if first:
         print(f"[init] Created {DB_PATH}")
 
@@ -160,6 +262,44 @@ def init_db():
 class StudyBuddySystem:
     # Logic the menu calls
 
+    # Hot statements kept as fixed strings so sqlite3's statement cache reuses them
+    _SQL = {
+        "add_course": "INSERT OR IGNORE INTO enrollment(username, course_code) VALUES(?, ?)",
+        "list_courses": "SELECT course_code FROM enrollment WHERE username = ? ORDER BY course_code",
+        "add_availability": """
+            INSERT OR IGNORE INTO availability(username, day_of_week, start_time, end_time,
+                                               start_min, end_min, day_rank)
+            VALUES(?,?,?,?,?,?,?)
+        """,
+        "list_availability": """
+            SELECT id, day_of_week, start_time, end_time
+            FROM availability
+            WHERE username = ?
+            ORDER BY day_rank, start_min
+        """,
+        "availability_minutes": """
+            SELECT day_of_week, start_min, end_min
+            FROM availability
+            WHERE username = ?
+            ORDER BY day_rank, start_min
+        """,
+        "find_classmates_by_course": """
+            SELECT s.username, s.full_name
+            FROM enrollment e
+            JOIN student s ON s.username = e.username
+            WHERE e.course_code = ? AND e.username <> ?
+            ORDER BY e.username
+        """,
+    }
+
+    def __init__(self):
+        # Per-user {day: [(start,end), ...]} maps, dropped when availability changes
+        self._avail_cache: Dict[str, Dict[str, List[Tuple[int, int]]]] = {}
+
+    def clear_cache(self) -> None:
+        # Forget cached availability, e.g. after the database changed underneath us
+        self._avail_cache.clear()
+
     # Profiles & courses
 
     def create_profile(self, username: str, full_name: str) -> bool:
@@ -167,46 +307,65 @@ class StudyBuddySystem:
         if not username or not full_name:
             print("Error: username and full name required.")
             return False
-        try:
-            with get_conn() as con:
-                con.execute(
-                    "INSERT INTO student(username, full_name) VALUES(?, ?)",
-                    (username, full_name),
-                )
-            print("Profile created.")
-            return True
-        except sqlite3.IntegrityError:
+        with get_conn() as con:
+            cur = con.execute(
+                "INSERT OR IGNORE INTO student(username, full_name) VALUES(?, ?)",
+                (username, full_name),
+            )
+        if cur.rowcount != 1:
             print("Error: username already exists. (AC-1)")
             return False
+        print("Profile created.")
+        return True
 
     def get_profile(self, username: str) -> Optional[sqlite3.Row]:
         # Fetch a student row
-        with get_conn() as con:
-            return con.execute(
-                "SELECT * FROM student WHERE username = ?",
-                (username,),
-            ).fetchone()
+        con = get_conn()
+        return con.execute(
+            "SELECT * FROM student WHERE username = ?",
+            (username,),
+        ).fetchone()
 
     def add_course(self, username: str, course_code: str) -> bool:
         # Add a course for a user (ensure no duplicates)
-        course_code = course_code.strip()
+        course_code = normalize_course(course_code)
         if not course_code:
             print("Error: course code required.")
             return False
         try:
             with get_conn() as con:
-                con.execute(
-                    "INSERT INTO enrollment(username, course_code) VALUES(?, ?)",
-                    (username, course_code),
-                )
-            print("Course added.")
-            return True
+                cur = con.execute(self._SQL["add_course"], (username, course_code))
         except sqlite3.IntegrityError:
+            # OR IGNORE covers duplicates only; a missing profile fails the foreign key
+            print("Error: no profile for that username.")
+            return False
+        if cur.rowcount != 1:
             print("Error: duplicate course not allowed. (FR-1.3)")
             return False
+        print("Course added.")
+        return True
+
+    def add_courses(self, username: str, course_codes: List[str]) -> int:
+        # Add several courses in one transaction; duplicates are skipped
+        codes = [c for c in map(normalize_course, course_codes) if c]
+        if not codes:
+            print("Error: course code required.")
+            return 0
+        try:
+            with get_conn() as con:
+                cur = con.executemany(self._SQL["add_course"], [(username, c) for c in codes])
+        except sqlite3.IntegrityError:
+            print("Error: no profile for that username.")
+            return 0
+        added = cur.rowcount
+        print(f"{added} course(s) added.")
+        if added < len(codes):
+            print(f"Skipped {len(codes) - added} duplicate course(s). (FR-1.3)")
+        return added
 
     def remove_course(self, username: str, course_code: str) -> None:
         # Remove a course if present
+        course_code = normalize_course(course_code)
         with get_conn() as con:
             con.execute(
                 "DELETE FROM enrollment WHERE username = ? AND course_code = ?",
@@ -216,160 +375,170 @@ class StudyBuddySystem:
 
     def list_courses(self, username: str) -> List[str]:
         # List user's courses sorted
-        with get_conn() as con:
-            rows = con.execute(
-                "SELECT course_code FROM enrollment WHERE username = ? ORDER BY course_code",
-                (username,),
-            ).fetchall()
-        return [r["course_code"] for r in rows]
+        con = get_conn()
+        cur = con.execute(self._SQL["list_courses"], (username,))
+        cur.row_factory = None  # internal lookup: plain tuples, no sqlite3.Row
+        return [code for (code,) in cur]
 
     # Availability
 
-    def add_availability(self, username: str, day: str, start: str, end: str) -> bool:
-        # Insert availability after validating inputs
+    def _validate_slot(self, day: str, start: str, end: str) -> Optional[Tuple[str, int, int]]:
+        # Return (day, start_min, end_min) for a valid slot, else print why and return None
         day_norm = normalize_day(day)
         if day_norm is None:
             print("Error: day must be one of Mon..Sun.")
-            return False
+            return None
         start_min = to_minutes(start)
         end_min = to_minutes(end)
         if start_min is None or end_min is None:
             print('Error: time must be "HH:MM" (24-hour) or "H:MM AM/PM".')
-            return False
+            return None
         if start_min >= end_min:
             print("Error: start must be earlier than end. (AC-2)")
+            return None
+        return (day_norm, start_min, end_min)
+
+    def add_availability(self, username: str, day: str, start: str, end: str) -> bool:
+        # Insert availability after validating inputs
+        slot = self._validate_slot(day, start, end)
+        if slot is None:
             return False
+        day_norm, start_min, end_min = slot
         try:
             with get_conn() as con:
-                con.execute(
-                    "INSERT INTO availability(username, day_of_week, start_time, end_time) VALUES(?,?,?,?)",
-                    (username, day_norm, start, end),
+                cur = con.execute(
+                    self._SQL["add_availability"],
+                    (username, day_norm, start, end, start_min, end_min, DAY_RANK[day_norm]),
                 )
-            print("Availability added.")
-            return True
         except sqlite3.IntegrityError:
+            print("Error: no profile for that username.")
+            return False
+        if cur.rowcount != 1:
             print("Error: exact duplicate availability not allowed. (FR-2.4)")
             return False
+        self._avail_cache.pop(username, None)
+        print("Availability added.")
+        return True
+
+    def add_availabilities(self, username: str, slots: List[Tuple[str, str, str]]) -> int:
+        # Add several (day, start, end) slots in one transaction; all must be valid
+        checked = [self._validate_slot(day, start, end) for (day, start, end) in slots]
+        if not slots or None in checked:
+            print("Error: no availability added.")
+            return 0
+        rows = [
+            (username, day_norm, start, end, start_min, end_min, DAY_RANK[day_norm])
+            for (_, start, end), (day_norm, start_min, end_min) in zip(slots, checked)
+        ]
+        try:
+            with get_conn() as con:
+                cur = con.executemany(self._SQL["add_availability"], rows)
+        except sqlite3.IntegrityError:
+            print("Error: no profile for that username.")
+            return 0
+        self._avail_cache.pop(username, None)
+        added = cur.rowcount
+        print(f"{added} availability slot(s) added.")
+        if added < len(rows):
+            print(f"Skipped {len(rows) - added} duplicate slot(s). (FR-2.4)")
+        return added
 
     def remove_availability(self, availability_id: int) -> None:
         # Delete an availability row by id
         with get_conn() as con:
             con.execute("DELETE FROM availability WHERE id = ?", (availability_id,))
+        # Removal is by id, so the owner is unknown here; drop every cached map
+        self.clear_cache()
         print("If present, availability removed.")
 
     def list_availability(self, username: str) -> List[sqlite3.Row]:
         # List availability in weekday order then by start time
-        with get_conn() as con:
-            return con.execute(
-                """
-                SELECT id, day_of_week, start_time, end_time
-                FROM availability
-                WHERE username = ?
-                ORDER BY CASE day_of_week
-                  WHEN 'Mon' THEN 1 WHEN 'Tue' THEN 2 WHEN 'Wed' THEN 3 WHEN 'Thu' THEN 4
-                  WHEN 'Fri' THEN 5 WHEN 'Sat' THEN 6 WHEN 'Sun' THEN 7 END,
-                  start_time
-                """,
-                (username,),
-            ).fetchall()
+        con = get_conn()
+        return con.execute(self._SQL["list_availability"], (username,)).fetchall()
 
     # Search & suggestions
 
     def find_classmates_by_course(self, username: str, course_code: str) -> List[sqlite3.Row]:
         # Find other students in the same course
-        with get_conn() as con:
-            return con.execute(
-                """
-                SELECT s.username, s.full_name
-                FROM enrollment e
-                JOIN student s ON s.username = e.username
-                WHERE e.course_code = ? AND s.username <> ?
-                ORDER BY s.username
-                """,
-                (course_code, username),
-            ).fetchall()
+        course_code = normalize_course(course_code)
+        con = get_conn()
+        return con.execute(
+            self._SQL["find_classmates_by_course"], (course_code, username)
+        ).fetchall()
 
     def suggest_matches(self, username: str) -> List[dict]:
         # Suggest classmates with at least 30 min overlap
-        my_courses = set(self.list_courses(username))
-        if not my_courses:
-            return []
-
-        placeholders = ",".join("?" * len(my_courses))
-        with get_conn() as con:
-            rows = con.execute(
-                f"""
-                SELECT DISTINCT s.username, s.full_name, e.course_code
-                FROM enrollment e
-                JOIN student s ON s.username = e.username
-                WHERE e.course_code IN ({placeholders})
-                  AND s.username <> ?
-                """,
-                (*sorted(my_courses), username),
-            ).fetchall()
+        my_avail = self._availability_by_day(username)
+        if not any(my_avail[d] for d in DAYS):
+            return []  # no slots of my own, so nothing can overlap
+
+        # One query pairs my slots with each classmate's slots on the same day
+        # and keeps only pairs that overlap by 30+ minutes
+        con = get_conn()
+        cur = con.execute(
+            """
+            SELECT c.username, c.full_name, e2.course_code, a1.day_of_week,
+                   MAX(a1.start_min, a2.start_min) AS ov_s,
+                   MIN(a1.end_min, a2.end_min) AS ov_e
+            FROM enrollment e1
+            JOIN enrollment e2 ON e2.course_code = e1.course_code AND e2.username <> ?
+            JOIN student c ON c.username = e2.username
+            JOIN availability a1 ON a1.username = ?
+            JOIN availability a2 ON a2.username = e2.username AND a2.day_of_week = a1.day_of_week
+            WHERE e1.username = ?
+              AND MIN(a1.end_min, a2.end_min) - MAX(a1.start_min, a2.start_min) >= 30
+            ORDER BY c.username, a1.day_rank, a1.start_min, a2.start_min
+            """,
+            (username, username, username),
+        )
+        cur.row_factory = None  # internal lookup: plain tuples, no sqlite3.Row
 
         classmates = {}
-        for r in rows:
-            classmates.setdefault(
-                r["username"], {"full_name": r["full_name"], "courses": set()}
+        for (cname, full_name, course, day, ov_s, ov_e) in cur:
+            info = classmates.setdefault(
+                cname,
+                {"full_name": full_name, "courses": set(), "example": (day, ov_s, ov_e)},
             )
-            classmates[r["username"]]["courses"].add(r["course_code"])
-
-        my_avail = self._availability_by_day(username)
+            info["courses"].add(course)
 
         suggestions = []
         for cname, info in classmates.items():
-            c_avail = self._availability_by_day(cname)
-            example = self._first_overlap_example(my_avail, c_avail, min_minutes=30)
-            if example is not None:
-                day, start_min, end_min = example
-                suggestions.append({
-                    "classmate_username": cname,
-                    "full_name": info["full_name"],
-                    "shared_courses": sorted(info["courses"]),
-                    "overlap_day": day,
-                    "overlap_start": minutes_to_ampm(start_min),
-                    "overlap_end": minutes_to_ampm(end_min),
-                })
+            day, start_min, end_min = info["example"]
+            suggestions.append({
+                "classmate_username": cname,
+                "full_name": info["full_name"],
+                "shared_courses": sorted(info["courses"]),
+                "overlap_day": day,
+                "overlap_start": minutes_to_ampm(start_min),
+                "overlap_end": minutes_to_ampm(end_min),
+            })
         return suggestions
 
     def _availability_by_day(self, username: str):
-        # Build {day: [(start,end), ...]} in minutes
+        # Build {day: [(start,end), ...]} in minutes, sorted by start (the query
+        # orders by start_min) and cached until availability changes
+        daymap = self._avail_cache.get(username)
+        if daymap is not None:
+            return daymap
         daymap = {d: [] for d in DAYS}
-        for row in self.list_availability(username):
-            s = to_minutes(row["start_time"])
-            e = to_minutes(row["end_time"])
+        con = get_conn()
+        cur = con.execute(self._SQL["availability_minutes"], (username,))
+        cur.row_factory = None  # internal lookup: plain tuples, no sqlite3.Row
+        found = False
+        for day, s, e in cur:
             if s is not None and e is not None:
-                daymap[row["day_of_week"]].append((s, e))
+                daymap[day].append((s, e))
+                found = True
+        if found:  # skip empty results so mistyped usernames don't pile up
+            self._avail_cache[username] = daymap
         return daymap
 
-    def _first_overlap_example(self, mine, theirs, min_minutes=30):
-        # Return one overlap example (day, start, end) or None
-        for d in DAYS:
-            for (ms, me) in mine[d]:
-                for (ts, te) in theirs[d]:
-                    ov = overlap_minutes(ms, me, ts, te)
-                    if ov >= min_minutes:
-                        start = max(ms, ts)
-                        end = start + ov
-                        return (d, start, end)
-        return None
-
     # Sessions
 
     def propose_session(
         self, initiator: str, invitee: str, course_code: str, day: str, start: str, end: str
     ) -> Optional[int]:
-        # Basic checks: users exist and share the course
-        if not self.get_profile(initiator) or not self.get_profile(invitee):
-            print("Error: both users must exist.")
-            return None
-        if course_code not in set(self.list_courses(initiator)):
-            print("Error: initiator is not enrolled in that course.")
-            return None
-        if course_code not in set(self.list_courses(invitee)):
-            print("Error: invitee is not enrolled in that course.")
-            return None
+        course_code = normalize_course(course_code)
 
         # Validate day and times
         day_norm = normalize_day(day)
@@ -385,63 +554,81 @@ class StudyBuddySystem:
             print("Error: proposed session must be at least 30 minutes.")
             return None
 
-        # Make sure the requested window fits inside some overlap
+        # Make sure the requested window fits inside some overlap. That holds
+        # exactly when one slot from each side contains it, so each side is
+        # scanned once instead of pairwise, and the invitee's slots are only
+        # loaded if the initiator's side already fits
         my_avail = self._availability_by_day(initiator)
-        their_avail = self._availability_by_day(invitee)
-
-        ok = False
-        for (ms, me) in my_avail[day_norm]:
-            for (ts, te) in their_avail[day_norm]:
-                ov = overlap_minutes(ms, me, ts, te)
-                if ov >= 30 and interval_includes(start_min, end_min, max(ms, ts), min(me, te)):
-                    ok = True
-                    break
-            if ok:
-                break
+        ok = (slots_include(my_avail[day_norm], start_min, end_min)
+              and slots_include(self._availability_by_day(invitee)[day_norm], start_min, end_min))
         if not ok:
-            print("Error: proposal outside overlapping availability. (FR-4.2 / AC-5)")
+            print(self._proposal_party_error(initiator, invitee, course_code)
+                  or "Error: proposal outside overlapping availability. (FR-4.2 / AC-5)")
             return None
 
-        # Save proposal
+        # Save proposal; the insert only happens if both users share the course
         with get_conn() as con:
             cur = con.execute(
                 """
                 INSERT INTO session(course_code, initiator_username, invitee_username,
-                                    day_of_week, start_time, end_time, status)
-                VALUES(?,?,?,?,?,?, 'Proposed')
+                                    day_of_week, start_time, end_time, start_min, end_min, status)
+                SELECT ?,?,?,?,?,?,?,?, 'Proposed'
+                WHERE EXISTS(SELECT 1 FROM enrollment WHERE username = ? AND course_code = ?)
+                  AND EXISTS(SELECT 1 FROM enrollment WHERE username = ? AND course_code = ?)
                 """,
-                (course_code, initiator, invitee, day_norm, start, end),
+                (course_code, initiator, invitee, day_norm, start, end, start_min, end_min,
+                 initiator, course_code, invitee, course_code),
             )
-            session_id = cur.lastrowid
+            session_id = cur.lastrowid if cur.rowcount == 1 else None
+        if session_id is None:
+            print(self._proposal_party_error(initiator, invitee, course_code)
+                  or "Error: proposal could not be recorded.")
+            return None
         print(f"Proposed session #{session_id} recorded.")
         return session_id
 
-    def list_sessions_for(self, username: str) -> List[sqlite3.Row]:
-        # All sessions where user is initiator or invitee
-        with get_conn() as con:
-            return con.execute(
-                """
-                SELECT id, course_code, initiator_username, invitee_username,
-                       day_of_week, start_time, end_time, status
-                FROM session
-                WHERE initiator_username = ? OR invitee_username = ?
-                ORDER BY id DESC
-                """,
-                (username, username),
-            ).fetchall()
+    def _proposal_party_error(self, initiator: str, invitee: str, course_code: str) -> Optional[str]:
+        # Explain a rejected proposal: users must exist and share the course
+        if not self.get_profile(initiator) or not self.get_profile(invitee):
+            return "Error: both users must exist."
+        if course_code not in set(self.list_courses(initiator)):
+            return "Error: initiator is not enrolled in that course."
+        if course_code not in set(self.list_courses(invitee)):
+            return "Error: invitee is not enrolled in that course."
+        return None
+
+    def list_sessions_for(self, username: str) -> Iterator[Tuple]:
+        # All sessions where user is initiator or invitee, newest first, streamed as
+        # plain tuples:
+        # (id, course_code, initiator, invitee, day_of_week, start_time, end_time, status)
+        # The result is a live cursor: it can be iterated only once and has no
+        # truth value for emptiness, so wrap it in list() if it must be reused
+        con = get_conn()
+        cur = con.execute(
+            """
+            SELECT id, course_code, initiator_username, invitee_username,
+                   day_of_week, start_time, end_time, status
+            FROM session
+            WHERE initiator_username = ? OR invitee_username = ?
+            ORDER BY id DESC
+            """,
+            (username, username),
+        )
+        cur.row_factory = None  # skip sqlite3.Row construction for this bulk listing
+        return cur  # rows are read as the caller iterates, not materialized up front
 
     def list_proposed_for_invitee(self, invitee: str) -> List[sqlite3.Row]:
         # Pending proposals for a user
-        with get_conn() as con:
-            return con.execute(
-                """
-                SELECT id, course_code, initiator_username, day_of_week, start_time, end_time
-                FROM session
-                WHERE invitee_username = ? AND status = 'Proposed'
-                ORDER BY id DESC
-                """,
-                (invitee,),
-            ).fetchall()
+        con = get_conn()
+        return con.execute(
+            """
+            SELECT id, course_code, initiator_username, day_of_week, start_time, end_time
+            FROM session
+            WHERE invitee_username = ? AND status = 'Proposed'
+            ORDER BY id DESC
+            """,
+            (invitee,),
+        ).fetchall()
 
     def confirm_session(self, session_id: int, invitee: str) -> bool:
         # Invitee confirms if no conflict with other confirmed sessions
@@ -458,25 +645,20 @@ class StudyBuddySystem:
                 return True
 
             # Check for overlap on same day with other confirmed sessions
-            rows = con.execute(
+            conflict = con.execute(
                 """
-                SELECT day_of_week, start_time, end_time
-                FROM session
+                SELECT 1 FROM session
                 WHERE status = 'Confirmed'
+                  AND day_of_week = ?
                   AND (initiator_username = ? OR invitee_username = ?)
+                  AND start_min < ? AND end_min > ?
+                LIMIT 1
                 """,
-                (invitee, invitee),
-            ).fetchall()
-
-            smin = to_minutes(sess["start_time"])
-            emin = to_minutes(sess["end_time"])
-            for r in rows:
-                if r["day_of_week"] != sess["day_of_week"]:
-                    continue
-                rs, re = to_minutes(r["start_time"]), to_minutes(r["end_time"])
-                if overlap_minutes(smin, emin, rs, re) > 0:
-                    print("Error: overlaps an existing confirmed session. (FR-4.5 / AC-6)")
-                    return False
+                (sess["day_of_week"], invitee, invitee, sess["end_min"], sess["start_min"]),
+            ).fetchone()
+            if conflict:
+                print("Error: overlaps an existing confirmed session. (FR-4.5 / AC-6)")
+                return False
 
             con.execute("UPDATE session SET status = 'Confirmed' WHERE id = ?", (session_id,))
             print("Session confirmed.")
@@ -582,14 +764,19 @@ class MenuUI:
         self._need_active()
         while True:
             print("\n-- Manage Courses --")
-            print("1) Add course")
+            print("1) Add course(s)")
             print("2) Remove course")
             print("3) View my courses")
             print("0) Back")
             c = prompt("Choose: ")
             if c == "1":
-                course = prompt("Course code (e.g., MATH 4000): ")
-                self.sys.add_course(self.active_user, course)
+                raw = prompt("Course code(s), comma-separated (e.g., MATH 4000, CS 1010): ")
+                codes = [code for code in map(normalize_course, raw.split(",")) if code]
+                if len(codes) > 1:
+                    self.sys.add_courses(self.active_user, codes)
+                else:
+                    # A single code (or none, which add_course reports as an error)
+                    self.sys.add_course(self.active_user, codes[0] if codes else "")
             elif c == "2":
                 course = prompt("Course code to remove: ")
                 self.sys.remove_course(self.active_user, course)
@@ -680,13 +867,12 @@ class MenuUI:
     def list_sessions_flow(self):
         self._need_active()
         rows = self.sys.list_sessions_for(self.active_user)
-        if not rows:
+        any_rows = False
+        for (sid, course, initiator, invitee, day, start, end, status) in rows:
+            any_rows = True
+            print(f"#{sid} {status} | {course} | {day} {start}–{end} | {initiator} -> {invitee}")
+        if not any_rows:
             print("(no sessions)")
-            return
-        for r in rows:
-            print(f"#{r['id']} {r['status']} | {r['course_code']} | {r['day_of_week']} "
-                  f"{r['start_time']}–{r['end_time']} | "
-                  f"{r['initiator_username']} -> {r['invitee_username']}")
 
     def _need_active(self):
         # Guard for flows that require a user
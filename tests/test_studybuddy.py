@@ -2,63 +2,95 @@
 
 import unittest
 import sqlite3
-import sys
 import os
+import tempfile
 from unittest.mock import patch, MagicMock      #used for python testing
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from studybuddy import StudyBuddySystem, SCHEMA_SQL
+import studybuddy
+from studybuddy import StudyBuddySystem, MenuUI, SCHEMA_SQL
 
 
 
-def get_test_conn():        #resets database for each test
-    """Returns a fresh in-memory SQLite connection with schema initialized."""
+# Empty database with the schema installed, built once at import; test
+# databases are page-copied from it instead of re-running SCHEMA_SQL
+_TEMPLATE = sqlite3.connect(":memory:")
+_TEMPLATE.executescript(SCHEMA_SQL)
+
+
+# Throwaway test databases need no durability, so skip journal and sync work
+TEST_PRAGMAS = (
+    "journal_mode = MEMORY",
+    "synchronous = OFF",
+    "temp_store = MEMORY",
+    "locking_mode = EXCLUSIVE",
+    "cache_size = -65536",
+)
+
+
+def get_test_conn():        #in-memory database shared by the whole test class
+    """Returns an in-memory SQLite connection with schema initialized."""
     conn = sqlite3.connect(":memory:")
     conn.row_factory = sqlite3.Row
-    conn.executescript(SCHEMA_SQL)
+    conn.execute("PRAGMA foreign_keys = ON")   # connection setting, not copied with the pages
+    for pragma in TEST_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    _TEMPLATE.backup(conn)
     return conn
 
 
+def reset_test_conn(conn):      #puts the database back to the empty template
+    """Overwrites conn with the template pages (the app commits its own writes,
+    so a per-test SAVEPOINT/ROLLBACK would be released by those commits)."""
+    _TEMPLATE.backup(conn)
+
+
 class TestStudyBuddySystem(unittest.TestCase):
-    def setUp(self):
-        self.conn = get_test_conn()
-        self.system = StudyBuddySystem()
-        # Patch the system's get_conn method to use our in-memory DB
-        self.original_get_conn = self.system.__class__.__dict__['create_profile'].__globals__['get_conn']
-        self.system.__class__.__dict__['create_profile'].__globals__['get_conn'] = lambda: self.conn
-
-    def tearDown(self):     # Restore the original get_conn after each test
-        self.system.__class__.__dict__['create_profile'].__globals__['get_conn'] = self.original_get_conn
-        self.conn.close()
-
-    def test_create_profile_success(self):          #profile creation test, returns true if successful
-        result = self.system.create_profile("alice", "Alice Smith")
-        self.assertTrue(result)
-    
-    def test_create_profile_duplicate(self):            #duplicate test, returns false if username already exists
-        self.system.create_profile("bob", "Bob Jones")
-        result = self.system.create_profile("bob", "Bobby Jones")
-        self.assertFalse(result)
-
-    def test_add_and_list_courses(self):                    #add courses test, lists courses if added successfully, returns true
-        self.system.create_profile("carol", "Carol White")
-        self.assertTrue(self.system.add_course("carol", "MATH 101"))
-        self.assertTrue(self.system.add_course("carol", "CS 200"))
-        courses = self.system.list_courses("carol")
-        self.assertIn("MATH 101", courses)
-        self.assertIn("CS 200", courses)
-
-    def test_add_duplicate_course(self):        #returns false if course already exists
-        self.system.create_profile("dave", "Dave Black")
-        self.system.add_course("dave", "BIO 150")
-        result = self.system.add_course("dave", "BIO 150")
-        self.assertFalse(result)
-
-    def test_remove_course(self):       #removes course if it exists, checks if course is removed from list
-        self.system.create_profile("erin", "Erin Green")
-        self.system.add_course("erin", "CHEM 101")
-        self.system.remove_course("erin", "CHEM 101")
-        courses = self.system.list_courses("erin")
-        self.assertNotIn("CHEM 101", courses)
+    @classmethod
+    def setUpClass(cls):        # schema is installed once and get_conn is patched once for the class
+        cls.conn = get_test_conn()
+        cls.addClassCleanup(cls.conn.close)
+        conn_patch = patch.object(studybuddy, "get_conn", return_value=cls.conn)
+        conn_patch.start()
+        cls.addClassCleanup(conn_patch.stop)
+        cls.system = StudyBuddySystem()     # one instance for the class; only the DB is per-test
+
+    def _has_course(self, username, course_code):      # indexed point lookup instead of scanning list_courses()
+        row = self.conn.execute(
+            "SELECT 1 FROM enrollment WHERE username = ? AND course_code = ?",
+            (username, course_code),
+        ).fetchone()
+        return row is not None
+
+    def _seed(self, sql):       # load known-good fixture rows in one script, skipping API validation
+        self.conn.executescript(sql)
+        self.conn.commit()
+
+    def tearDown(self):     # wipe the shared database (and the availability cache built from it) after each test
+        reset_test_conn(self.conn)
+        self.system.clear_cache()
+
+    def test_profile_and_course_matrix(self):       #profile and course scenarios share one setUp; each runs as its own subTest
+        cases = [
+            # (username, full name, courses to add, expected add_course results)
+            ("alice", "Alice Smith", [], []),                                   #profile creation returns true
+            ("carol", "Carol White", ["MATH 101", "CS 200"], [True, True]),     #added courses are listed
+            ("dave", "Dave Black", ["BIO 150", "BIO 150"], [True, False]),      #duplicate course returns false
+        ]
+        for username, full_name, courses, expected in cases:
+            with self.subTest(user=username):
+                self.assertTrue(self.system.create_profile(username, full_name))
+                self.assertEqual([self.system.add_course(username, c) for c in courses], expected)
+                for course in courses:
+                    self.assertTrue(self._has_course(username, course))
+
+        with self.subTest(user="bob"):      #duplicate username returns false
+            self.system.create_profile("bob", "Bob Jones")
+            self.assertFalse(self.system.create_profile("bob", "Bobby Jones"))
+
+        with self.subTest(user="erin"):     #removed course is no longer listed
+            self.system.create_profile("erin", "Erin Green")
+            self.system.add_course("erin", "CHEM 101")
+            self.system.remove_course("erin", "CHEM 101")
+            self.assertFalse(self._has_course("erin", "CHEM 101"))
 
     def test_add_and_list_availability(self):           #adds availability if valid, lists availability slots
         self.system.create_profile("frank", "Frank Blue")
@@ -86,23 +118,260 @@ class TestStudyBuddySystem(unittest.TestCase):
         self.assertEqual(classmates[0]["username"], "ivy")
 
     def test_suggest_matches_no_overlap(self):          #tests suggest matches with no overlapping availability, returns empty list if no matches found
-        self.system.create_profile("jack", "Jack Orange")
-        self.system.create_profile("kate", "Kate Purple")
-        self.system.add_course("jack", "HIST 101")
-        self.system.add_course("kate", "HIST 101")
-        self.system.add_availability("jack", "Mon", "08:00", "09:00")
-        self.system.add_availability("kate", "Mon", "10:00", "11:00")
+        self._seed("""
+            INSERT INTO student(username, full_name) VALUES ('jack', 'Jack Orange'), ('kate', 'Kate Purple');
+            INSERT INTO enrollment(username, course_code) VALUES ('jack', 'HIST 101'), ('kate', 'HIST 101');
+            INSERT INTO availability(username, day_of_week, start_time, end_time, start_min, end_min, day_rank)
+            VALUES ('jack', 'Mon', '08:00', '09:00', 480, 540, 1), ('kate', 'Mon', '10:00', '11:00', 600, 660, 1);
+        """)
         suggestions = self.system.suggest_matches("jack")
         self.assertEqual(suggestions, [])
 
     def test_suggest_matches_with_overlap(self):        #tests suggest matches with overlapping availability, returns list of matches if found, checks if correct match is returned
-        self.system.create_profile("leo", "Leo Silver")
-        self.system.create_profile("maya", "Maya Gold")
-        self.system.add_course("leo", "PHYS 101")
-        self.system.add_course("maya", "PHYS 101")
-        self.system.add_availability("leo", "Tue", "10:00", "12:00")
-        self.system.add_availability("maya", "Tue", "11:00", "13:00")
+        self._seed("""
+            INSERT INTO student(username, full_name) VALUES ('leo', 'Leo Silver'), ('maya', 'Maya Gold');
+            INSERT INTO enrollment(username, course_code) VALUES ('leo', 'PHYS 101'), ('maya', 'PHYS 101');
+            INSERT INTO availability(username, day_of_week, start_time, end_time, start_min, end_min, day_rank)
+            VALUES ('leo', 'Tue', '10:00', '12:00', 600, 720, 2), ('maya', 'Tue', '11:00', '13:00', 660, 780, 2);
+        """)
         suggestions = self.system.suggest_matches("leo")
         self.assertEqual(len(suggestions), 1)
         self.assertEqual(suggestions[0]["classmate_username"], "maya")
 
+
+    def test_suggest_matches_overlap_window(self):      #checks the reported overlap window, mixing 24h and 12h inputs
+        self.system.create_profile("nina", "Nina Teal")
+        self.system.create_profile("omar", "Omar Tan")
+        self.system.add_course("nina", "ART 110")
+        self.system.add_course("omar", "ART 110")
+        self.system.add_availability("nina", "Wed", "9:00 AM", "11:00 AM")
+        self.system.add_availability("omar", "Wed", "10:00", "13:00")
+        suggestions = self.system.suggest_matches("nina")
+        self.assertEqual(len(suggestions), 1)
+        self.assertEqual(suggestions[0]["overlap_day"], "Wed")
+        self.assertEqual(suggestions[0]["overlap_start"], "10:00 AM")
+        self.assertEqual(suggestions[0]["overlap_end"], "11:00 AM")
+
+    def test_propose_session_sees_new_availability(self):      #cached availability is refreshed after a slot is added
+        self.system.create_profile("pia", "Pia Lime")
+        self.system.create_profile("quin", "Quin Navy")
+        self.system.add_course("pia", "GEO 120")
+        self.system.add_course("quin", "GEO 120")
+        self.system.add_availability("pia", "Thu", "09:00", "10:00")
+        self.system.add_availability("quin", "Thu", "14:00", "16:00")
+        self.assertIsNone(self.system.propose_session("pia", "quin", "GEO 120", "Thu", "14:00", "15:00"))
+        self.system.add_availability("pia", "Thu", "13:00", "17:00")
+        self.assertIsNotNone(self.system.propose_session("pia", "quin", "GEO 120", "Thu", "14:00", "15:00"))
+
+    def test_bulk_add_courses_and_availability(self):     #bulk adds run in one batch and skip duplicates
+        self.system.create_profile("rita", "Rita Plum")
+        self.assertEqual(self.system.add_courses("rita", ["MATH 101", "CS 200", "MATH 101"]), 2)
+        self.assertEqual(self.system.list_courses("rita"), ["CS 200", "MATH 101"])
+        slots = [("Mon", "09:00", "10:00"), ("Tuesday", "1:00 PM", "2:00 PM")]
+        self.assertEqual(self.system.add_availabilities("rita", slots), 2)
+        self.assertEqual(len(self.system.list_availability("rita")), 2)
+        # One invalid slot rejects the whole batch
+        self.assertEqual(self.system.add_availabilities("rita", [("Wed", "09:00", "10:00"), ("Funday", "09:00", "10:00")]), 0)
+        self.assertEqual(len(self.system.list_availability("rita")), 2)
+
+    def test_list_sessions_for_streams_tuples(self):     #sessions come back as plain tuples in fixed column order, newest first
+        for u in ("cal", "dee", "eli"):
+            self.system.create_profile(u, u.title())
+            self.system.add_course(u, "ECON 200")
+            self.system.add_availability(u, "Sat", "10:00", "12:00")
+        first = self.system.propose_session("cal", "dee", "ECON 200", "Sat", "10:00", "11:00")
+        second = self.system.propose_session("eli", "cal", "ECON 200", "Sat", "11:00", "12:00")
+        self.system.propose_session("dee", "eli", "ECON 200", "Sat", "10:00", "10:30")  # not involving cal
+        self.system.confirm_session(first, "dee")
+        rows = list(self.system.list_sessions_for("cal"))
+        self.assertEqual(rows, [
+            (second, "ECON 200", "eli", "cal", "Sat", "11:00", "12:00", "Proposed"),
+            (first, "ECON 200", "cal", "dee", "Sat", "10:00", "11:00", "Confirmed"),
+        ])
+
+    def test_unknown_user_adds_are_rejected(self):      #adds for a username with no profile return false/0 instead of raising
+        self.assertFalse(self.system.add_course("ghost", "X 1"))
+        self.assertEqual(self.system.add_courses("ghost", ["X 1", "X 2"]), 0)
+        self.assertFalse(self.system.add_availability("ghost", "Mon", "09:00", "10:00"))
+        self.assertEqual(self.system.add_availabilities("ghost", [("Mon", "09:00", "10:00")]), 0)
+        self.assertFalse(self._has_course("ghost", "X 1"))
+
+    def test_menu_add_courses_splits_input(self):       #menu add-course input is split and normalized; a trailing comma still means one course
+        self.system.create_profile("sol", "Sol Peach")
+        ui = MenuUI(self.system)
+        ui.active_user = "sol"
+        with patch.object(studybuddy, "prompt", side_effect=["1", "math 101,", "1", "cs 200, bio 150", "0"]):
+            ui.manage_courses_flow()
+        self.assertEqual(self.system.list_courses("sol"), ["BIO 150", "CS 200", "MATH 101"])
+
+    def test_confirm_session_rejects_overlap(self):     #confirming is refused when it overlaps an already confirmed session
+        for u in ("sam", "tia", "uma"):
+            self.system.create_profile(u, u.title())
+            self.system.add_course(u, "LAW 210")
+            self.system.add_availability(u, "Fri", "09:00", "12:00")
+        first = self.system.propose_session("sam", "tia", "LAW 210", "Fri", "09:00", "10:00")
+        second = self.system.propose_session("uma", "tia", "LAW 210", "Fri", "09:30", "10:30")
+        third = self.system.propose_session("uma", "tia", "LAW 210", "Fri", "10:00", "11:00")
+        self.assertTrue(self.system.confirm_session(first, "tia"))
+        self.assertFalse(self.system.confirm_session(second, "tia"))
+        self.assertTrue(self.system.confirm_session(third, "tia"))
+
+    def test_course_codes_are_normalized(self):     #course codes match regardless of case and spacing
+        self.system.create_profile("vic", "Vic Rose")
+        self.system.create_profile("wes", "Wes Sand")
+        self.assertTrue(self.system.add_course("vic", "  math   4000 "))
+        self.assertFalse(self.system.add_course("vic", "MATH 4000"))
+        self.system.add_course("wes", "Math 4000")
+        self.assertEqual(self.system.list_courses("vic"), ["MATH 4000"])
+        classmates = self.system.find_classmates_by_course("vic", "math 4000")
+        self.assertEqual([r["username"] for r in classmates], ["wes"])
+
+    def test_suggest_matches_many_classmates(self):     #every qualifying classmate comes back from one pass, with all shared courses
+        self.system.create_profile("xena", "Xena Ash")
+        self.system.add_courses("xena", ["BIO 101", "CHEM 101"])
+        self.system.add_availability("xena", "Mon", "09:00", "12:00")
+        for u, courses, slot in (
+            ("yuri", ["BIO 101", "CHEM 101"], ("Mon", "11:00", "13:00")),
+            ("zane", ["CHEM 101"], ("Mon", "08:00", "09:45")),
+            ("abby", ["BIO 101"], ("Mon", "11:45", "13:00")),  # only 15 min overlap
+            ("ben", ["HIST 101"], ("Mon", "09:00", "12:00")),  # no shared course
+        ):
+            self.system.create_profile(u, u.title())
+            self.system.add_courses(u, courses)
+            self.system.add_availability(u, *slot)
+        suggestions = {s["classmate_username"]: s for s in self.system.suggest_matches("xena")}
+        self.assertEqual(sorted(suggestions), ["yuri", "zane"])
+        self.assertEqual(suggestions["yuri"]["shared_courses"], ["BIO 101", "CHEM 101"])
+        self.assertEqual(suggestions["zane"]["overlap_end"], "9:45 AM")
+
+
+# Schema as shipped before the integer-minute, day_rank and course-normalization
+# changes; used to build databases that init_db has to upgrade
+BASELINE_SCHEMA_SQL = """
+CREATE TABLE student (username TEXT PRIMARY KEY, full_name TEXT NOT NULL);
+CREATE TABLE enrollment (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username TEXT NOT NULL,
+  course_code TEXT NOT NULL,
+  UNIQUE(username, course_code)
+);
+CREATE TABLE availability (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username TEXT NOT NULL,
+  day_of_week TEXT NOT NULL,
+  start_time TEXT NOT NULL,
+  end_time   TEXT NOT NULL,
+  UNIQUE(username, day_of_week, start_time, end_time)
+);
+CREATE TABLE session (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  course_code TEXT NOT NULL,
+  initiator_username TEXT NOT NULL,
+  invitee_username   TEXT NOT NULL,
+  day_of_week TEXT NOT NULL,
+  start_time TEXT NOT NULL,
+  end_time   TEXT NOT NULL,
+  status TEXT NOT NULL
+);
+CREATE INDEX idx_enrollment_course ON enrollment(course_code);
+CREATE INDEX idx_avail_user ON availability(username);
+CREATE INDEX idx_session_invitee ON session(invitee_username, status);
+"""
+
+
+class TestInitDb(unittest.TestCase):
+    def setUp(self):        # point DB_PATH at a temp file and give get_conn a fresh shared connection
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "studybuddy.db")
+        for target in (patch.object(studybuddy, "DB_PATH", self.db_path),
+                       patch.object(studybuddy, "_conn", None)):
+            target.start()
+            self.addCleanup(target.stop)
+        self.addCleanup(self._close_conn)
+
+    def _close_conn(self):      # runs before the patches are undone
+        if studybuddy._conn is not None:
+            studybuddy._conn.close()
+
+    def _seed_baseline(self, sql):      # build an old-format database file, then close it
+        con = sqlite3.connect(self.db_path)
+        con.executescript(BASELINE_SCHEMA_SQL + sql)
+        con.commit()
+        con.close()
+
+    def test_init_db_normalizes_stored_courses(self):       #old course codes are rewritten and collapsed duplicates dropped
+        self._seed_baseline("""
+            INSERT INTO student VALUES ('amy', 'Amy'), ('bo', 'Bo');
+            INSERT INTO enrollment(username, course_code) VALUES ('amy', 'math 101'), ('amy', 'MATH  101'), ('bo', 'MATH 101');
+            INSERT INTO session(course_code, initiator_username, invitee_username, day_of_week, start_time, end_time, status)
+            VALUES ('math 101', 'amy', 'bo', 'Mon', '10:00', '11:00', 'Proposed');
+        """)
+        studybuddy.init_db()
+        con = studybuddy.get_conn()
+        rows = con.execute("SELECT course_code FROM enrollment WHERE username = 'amy'").fetchall()
+        self.assertEqual([r[0] for r in rows], ["MATH 101"])
+        self.assertEqual(con.execute("SELECT course_code FROM session").fetchone()[0], "MATH 101")
+
+    def test_init_db_resumes_interrupted_backfill(self):       #a crash after the ALTERs is finished by the next run
+        self._seed_baseline("""
+            INSERT INTO student VALUES ('amy', 'Amy');
+            INSERT INTO availability(username, day_of_week, start_time, end_time)
+            VALUES ('amy', 'Mon', '10:00', '11:00');
+        """)
+        with patch.object(studybuddy, "to_minutes", side_effect=RuntimeError("interrupted")):
+            with self.assertRaises(RuntimeError):
+                studybuddy.init_db()
+        # Simulate a restart: drop the connection (losing anything uncommitted)
+        studybuddy._conn.close()
+        studybuddy._conn = None
+
+        studybuddy.init_db()
+        con = studybuddy.get_conn()
+        row = con.execute("SELECT start_min, end_min, day_rank FROM availability").fetchone()
+        self.assertEqual(tuple(row), (600, 660, 1))
+        self.assertEqual(studybuddy.StudyBuddySystem()._availability_by_day("amy")["Mon"], [(600, 660)])
+
+    def test_init_db_failed_upgrade_is_not_stamped(self):       #a late failure keeps user_version at 0 so the next run redoes the upgrade
+        self._seed_baseline("""
+            INSERT INTO student VALUES ('amy', 'Amy');
+            INSERT INTO enrollment(username, course_code) VALUES ('amy', 'math 101');
+        """)
+        with patch.object(studybuddy, "normalize_stored_courses", side_effect=RuntimeError("interrupted")):
+            with self.assertRaises(RuntimeError):
+                studybuddy.init_db()
+        studybuddy._conn.close()
+        studybuddy._conn = None
+
+        con = studybuddy.get_conn()
+        self.assertEqual(con.execute("PRAGMA user_version").fetchone()[0], 0)
+        studybuddy.init_db()
+        self.assertEqual(con.execute("PRAGMA user_version").fetchone()[0], studybuddy.SCHEMA_VERSION)
+        self.assertEqual(con.execute("SELECT course_code FROM enrollment").fetchone()[0], "MATH 101")
+
+    def test_init_db_backfills_and_skips_when_current(self):       #old rows get minutes/rank; a current database is left alone
+        self._seed_baseline("""
+            INSERT INTO student VALUES ('amy', 'Amy'), ('bo', 'Bo');
+            INSERT INTO availability(username, day_of_week, start_time, end_time)
+            VALUES ('amy', 'Wed', '9:00 AM', '10:30 AM'), ('bo', 'Sun', '13:15', '14:00');
+            INSERT INTO session(course_code, initiator_username, invitee_username, day_of_week, start_time, end_time, status)
+            VALUES ('MATH 101', 'amy', 'bo', 'Wed', '9:30 AM', '10:00', 'Proposed');
+        """)
+        studybuddy.init_db()
+        con = studybuddy.get_conn()
+        rows = con.execute(
+            "SELECT username, start_min, end_min, day_rank FROM availability ORDER BY id"
+        ).fetchall()
+        self.assertEqual([tuple(r) for r in rows], [("amy", 540, 630, 3), ("bo", 795, 840, 7)])
+        self.assertEqual(tuple(con.execute("SELECT start_min, end_min FROM session").fetchone()), (570, 600))
+        self.assertEqual(con.execute("PRAGMA user_version").fetchone()[0], studybuddy.SCHEMA_VERSION)
+
+        # Second run returns early: no migration, and a dropped index is not recreated
+        con.execute("DROP INDEX idx_avail_user_rank")
+        with patch.object(studybuddy, "migrate_db") as migrate:
+            studybuddy.init_db()
+        migrate.assert_not_called()
+        index = con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_avail_user_rank'"
+        ).fetchone()
+        self.assertIsNone(index)